@@ -1,162 +1,255 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.utils import secure_filename
 import os
-from ultralytics import YOLO
+import base64
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+import hashlib
+from collections import OrderedDict
 import cv2
-import requests
-from datetime import datetime, timedelta
-import json
+import numpy as np
+import orjson
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn, so only one process builds the engine
+    fcntl = None
+
+from config import (ENGINE_PATH, IMG_SIZE, INT8_CALIB_DATA, INT8_ENGINE_PATH, INT8_GOLD_DATA,
+                    INT8_MAX_MAP_DROP, MAX_BATCH, MAX_WAIT, MODEL_PATH, PERSIST_UPLOADS,
+                    PREDICT_TIMEOUT, RESULT_CACHE_SIZE, RESULT_FOLDER, UPLOAD_FOLDER, YOLO_PRECISION)
+from debris_utils import fetch_celestrak_data, get_processed, start_cache_refresher
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize responses with orjson instead of the stdlib json module"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
-# Paths
-MODEL_PATH = 'best.pt'
-UPLOAD_FOLDER = 'static/uploads'
-RESULT_FOLDER = 'static/results'
-CACHE_FILE = 'debris_cache.json'
-CACHE_DURATION = timedelta(hours=6)
+if PERSIST_UPLOADS:
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(RESULT_FOLDER, exist_ok=True)
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(RESULT_FOLDER, exist_ok=True)
+# ============= MODEL =============
 
-# Load YOLO model once at the beginning
-model = YOLO(MODEL_PATH)
+def export_engine(weights, **kwargs):
+    """Export weights to a TensorRT engine next to them and return its path"""
+    from ultralytics import YOLO
 
-# ============= HELPER FUNCTIONS =============
+    print(f"Exporting {weights} to TensorRT engine...")
+    return YOLO(weights).export(format='engine', imgsz=IMG_SIZE, dynamic=True,
+                                batch=MAX_BATCH, **kwargs)
 
-def fetch_celestrak_data(group='analyst', format='json'):
-    """
-    Fetch orbital data from CelesTrak
-    
-    Args:
-        group: GROUP parameter (e.g., 'analyst', 'active', 'starlink')
-        format: FORMAT parameter (json, xml, csv, tle)
-    """
-    base_url = "https://celestrak.org/NORAD/elements/gp.php"
-    params = {
-        'GROUP': group,
-        'FORMAT': format
-    }
-    
-    try:
-        print(f"Fetching data from CelesTrak: {base_url} with params {params}")
-        response = requests.get(base_url, params=params, timeout=30)
-        response.raise_for_status()
-        
-        if format == 'json':
-            data = response.json()
-            print(f"Successfully fetched {len(data)} objects from CelesTrak")
-            return data
-        elif format == 'csv':
-            return response.text
-        else:
-            return response.text
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from CelesTrak: {e}")
-        return None
+def fp16_engine():
+    """Return the FP16 engine path, exporting it on first use"""
+    if not os.path.exists(ENGINE_PATH):
+        exported = export_engine(MODEL_PATH, half=True)
+        if os.path.abspath(exported) != os.path.abspath(ENGINE_PATH):
+            os.replace(exported, ENGINE_PATH)
+    return ENGINE_PATH
 
-def get_cached_or_fetch(group='analyst'):
-    """Use cached data if available and fresh, otherwise fetch new data"""
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                cache = json.load(f)
-                cache_time = datetime.fromisoformat(cache['timestamp'])
-                
-                if datetime.now() - cache_time < CACHE_DURATION:
-                    print("Using cached data")
-                    return cache['data']
-        except Exception as e:
-            print(f"Error reading cache: {e}")
-    
-    # Fetch fresh data
-    print("Fetching fresh data from CelesTrak...")
-    data = fetch_celestrak_data(group=group, format='json')
-    
-    if data:
-        # Cache it
-        try:
-            with open(CACHE_FILE, 'w') as f:
-                json.dump({
-                    'timestamp': datetime.now().isoformat(),
-                    'data': data
-                }, f)
-            print("Data cached successfully")
-        except Exception as e:
-            print(f"Error caching data: {e}")
-    
-    return data
+def int8_engine():
+    """Return the INT8 engine path, or None if it can't be built or loses too much accuracy"""
+    from ultralytics import YOLO
+
+    # Left behind when the INT8 engine failed the gold-set check, so we don't retry every start
+    rejected_marker = INT8_ENGINE_PATH + '.rejected'
+    if os.path.exists(rejected_marker):
+        return None
+    if os.path.exists(INT8_ENGINE_PATH):
+        return INT8_ENGINE_PATH
+    if not os.path.exists(INT8_CALIB_DATA):
+        print(f"INT8 calibration data {INT8_CALIB_DATA} not found, using FP16 engine")
+        return None
 
-def calculate_altitude(obj):
-    """Calculate approximate altitude from TLE data"""
+    # Export from a copy with its own stem so ultralytics doesn't write over the
+    # FP16 engine, and only move the result into place once it passes validation
+    staging = os.path.splitext(INT8_ENGINE_PATH)[0] + '-staging'
     try:
-        # Mean motion is revolutions per day
-        mean_motion = float(obj.get('MEAN_MOTION', 0))
-        
-        if mean_motion == 0:
-            return None
-        
-        # Calculate semi-major axis using Kepler's third law
-        earth_radius = 6371  # km
-        mu = 398600.4418  # Earth's gravitational parameter (km^3/s^2)
-        
-        # Period in minutes
-        period = 1440 / mean_motion  # 1440 minutes in a day
-        period_seconds = period * 60
-        
-        # Semi-major axis
-        import math
-        a = (mu * (period_seconds / (2 * math.pi))**2)**(1/3)
-        
-        # Altitude = semi-major axis - Earth radius
-        altitude = a - earth_radius
-        
-        return round(altitude, 2)
+        shutil.copyfile(MODEL_PATH, staging + '.pt')
+        exported = export_engine(staging + '.pt', int8=True, data=INT8_CALIB_DATA, workspace=4)
+
+        if INT8_GOLD_DATA:
+            # Compare mAP50-95 against the unquantized weights
+            reference = YOLO(MODEL_PATH).val(data=INT8_GOLD_DATA, imgsz=IMG_SIZE, verbose=False).box.map
+            quantized = YOLO(exported, task='detect').val(data=INT8_GOLD_DATA, imgsz=IMG_SIZE,
+                                                          verbose=False).box.map
+            print(f"INT8 mAP50-95 {quantized:.4f} vs {reference:.4f} for {MODEL_PATH}")
+            if reference - quantized > INT8_MAX_MAP_DROP:
+                print("INT8 accuracy regressed too far, falling back to FP16 engine")
+                open(rejected_marker, 'w').close()
+                return None
+
+        os.replace(exported, INT8_ENGINE_PATH)
     except Exception as e:
-        print(f"Error calculating altitude: {e}")
+        print(f"Error building INT8 engine: {e}")
         return None
+    finally:
+        for leftover in (staging + '.pt', staging + '.onnx', staging + '.engine'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
 
-def filter_debris_only(data):
-    """Filter to only debris objects"""
-    debris = []
-    for obj in data:
-        obj_type = obj.get('OBJECT_TYPE', '').upper()
-        obj_name = obj.get('OBJECT_NAME', '').upper()
-        
-        # Include DEBRIS, ROCKET BODY, and objects with DEB in name as space junk
-        if ('DEBRIS' in obj_type or 
-            'ROCKET BODY' in obj_type or 
-            'DEB' in obj_type or 
-            'DEB' in obj_name or
-            'R/B' in obj_name):
-            debris.append(obj)
-    
-    print(f"Filtered {len(debris)} debris objects from {len(data)} total objects")
-    return debris
-
-def parse_satellite_data(data):
-    """Parse and simplify satellite/debris data for young learners"""
-    simplified = []
-    
-    for obj in data:
+    return INT8_ENGINE_PATH
+
+@contextmanager
+def _engine_lock():
+    """Serialize engine builds across processes sharing the working directory"""
+    with open(ENGINE_PATH + '.lock', 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+def select_engine():
+    """Return the TensorRT engine to serve (INT8 or FP16), building it if needed
+
+    Returns None if no engine could be built.
+    """
+    with _engine_lock():
+        engine = int8_engine() if YOLO_PRECISION == 'int8' else None
+        if engine is None:
+            try:
+                engine = fp16_engine()
+            except Exception as e:
+                print(f"Error exporting TensorRT engine: {e}")
+        return engine
+
+def load_model():
+    """Load a TensorRT engine (INT8 or FP16) on GPU, falling back to the PyTorch weights"""
+    # torch and ultralytics take seconds and ~1 GB to import; only /predict needs them
+    import torch
+    from ultralytics import YOLO
+
+    if not torch.cuda.is_available():
+        print("CUDA not available, using PyTorch weights")
+        return YOLO(MODEL_PATH)
+
+    engine = select_engine()
+    if engine is None:
+        # Only the PyTorch weights run through cuDNN (TensorRT has its own tactics).
+        # Letterboxing pads to multiples of 32 up to IMG_SIZE, so there are few
+        # distinct input shapes and each is autotuned once, then reused
+        torch.backends.cudnn.benchmark = True
+        return YOLO(MODEL_PATH)
+
+    return YOLO(engine, task='detect')
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """Return this process's YOLO model, loading it on first use"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = load_model()
+    return _model
+
+def preload_model():
+    """Prepare the model in a process that is about to fork workers
+
+    On CPU, the model is loaded here so gunicorn --preload shares the weights
+    copy-on-write across workers. CUDA state doesn't survive fork, so on GPU the
+    TensorRT engine is only built, in a child process, and each worker loads it
+    on first use instead of exporting it itself.
+    """
+    # Check for a GPU through NVML; the default check initializes the CUDA
+    # driver, which then can't be re-initialized in forked workers
+    os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+    import torch
+
+    if not torch.cuda.is_available():
+        get_model()
+    else:
+        subprocess.run([sys.executable, '-c', 'import app; app.select_engine()'],
+                       cwd=os.path.dirname(os.path.abspath(__file__)), check=False)
+
+# ============= BATCHED INFERENCE =============
+
+_batch_queue = queue.Queue(maxsize=MAX_BATCH * 4)
+
+def _batch_worker():
+    """Coalesce concurrent /predict images into a single YOLO call"""
+    device = None
+
+    while True:
+        batch = [_batch_queue.get()]
+        results = []
         try:
-            # CelesTrak JSON format uses these field names
-            satellite_info = {
-                'name': obj.get('OBJECT_NAME', 'Unknown'),
-                'satellite_id': obj.get('NORAD_CAT_ID'),
-                'country': obj.get('OBJECT_ID', 'UN')[:2],  # First 2 chars indicate country
-                'launch_date': obj.get('EPOCH'),
-                'altitude_km': calculate_altitude(obj),
-                'inclination': obj.get('INCLINATION'),
-                'period_minutes': obj.get('PERIOD'),
-                'object_type': obj.get('OBJECT_TYPE', 'UNKNOWN')
-            }
-            simplified.append(satellite_info)
+            deadline = time.monotonic() + MAX_WAIT
+
+            # Drain up to MAX_BATCH items or until MAX_WAIT has passed
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(_batch_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            import torch
+            if device is None:
+                device = 0 if torch.cuda.is_available() else 'cpu'
+
+            with torch.inference_mode():
+                results = get_model()([img for img, _, _ in batch], imgsz=IMG_SIZE, half=True,
+                                      device=device, verbose=False)
         except Exception as e:
-            print(f"Error parsing object: {e}")
-            continue
-    
-    return simplified
+            print(f"Error running batched inference: {e}")
+            results = [e] * len(batch)
+        finally:
+            # Always wake every waiting request, even if results came back short
+            for i, (_, done, result_slot) in enumerate(batch):
+                if i < len(results):
+                    result_slot['result'] = results[i]
+                else:
+                    result_slot['result'] = RuntimeError("No detections returned for image")
+                done.set()
+
+_batch_worker_pid = None
+_batch_worker_lock = threading.Lock()
+
+def _ensure_batch_worker():
+    """Start the batch worker in this process (threads don't survive a fork)"""
+    global _batch_worker_pid
+    with _batch_worker_lock:
+        if _batch_worker_pid != os.getpid():
+            threading.Thread(target=_batch_worker, daemon=True).start()
+            _batch_worker_pid = os.getpid()
+
+def predict_image(img):
+    """Queue an image for the batch worker and wait for its detections"""
+    _ensure_batch_worker()
+    done = threading.Event()
+    result_slot = {}
+    try:
+        _batch_queue.put((img, done, result_slot), timeout=PREDICT_TIMEOUT)
+    except queue.Full:
+        raise TimeoutError("Inference queue is full")
+    if not done.wait(PREDICT_TIMEOUT):
+        raise TimeoutError("Timed out waiting for inference")
+
+    result = result_slot['result']
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 # ============= ROUTES =============
 
@@ -177,36 +270,17 @@ def info():
     return render_template('info.html')
 
 @app.route('/api/debris')
-def get_debris_data():
+async def get_debris_data():
     """API endpoint to fetch debris data"""
     try:
-        # Fetch data with caching
-        all_data = get_cached_or_fetch(group='analyst')
+        processed = await get_processed(group='analyst')
         
-        if not all_data:
-            print("No data returned from CelesTrak")
+        if not processed:
             return jsonify({'error': 'Could not fetch data from CelesTrak'}), 500
         
-        print(f"Processing {len(all_data)} total objects")
-        
-        # Filter to only debris
-        debris = filter_debris_only(all_data)
-        
-        if not debris:
-            # If no debris found with strict filtering, return all data
-            print("No debris found with filtering, using all data")
-            debris = all_data
+        print(f"Returning {processed['debris']['count']} debris objects")
         
-        # Parse the data
-        simplified = parse_satellite_data(debris)
-        
-        print(f"Returning {len(simplified)} debris objects")
-        
-        return jsonify({
-            'count': len(simplified),
-            'debris': simplified[:100],  # Limit to 100 for performance
-            'total_tracked': len(all_data)
-        })
+        return jsonify(processed['debris'])
         
     except Exception as e:
         print(f"Error in get_debris_data: {e}")
@@ -215,64 +289,15 @@ def get_debris_data():
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 @app.route('/api/stats')
-def get_debris_stats():
+async def get_debris_stats():
     """Get statistics about space debris"""
     try:
-        # Fetch data with caching
-        all_data = get_cached_or_fetch(group='analyst')
+        processed = await get_processed(group='analyst')
         
-        if not all_data:
+        if not processed:
             return jsonify({'error': 'Could not fetch data from CelesTrak'}), 500
         
-        # Filter debris
-        debris = filter_debris_only(all_data)
-        
-        if not debris:
-            # If no debris found, use all data for stats
-            debris = all_data
-        
-        # Calculate statistics
-        total = len(debris)
-        countries = {}
-        altitude_ranges = {
-            'Low (0-2000 km)': 0,
-            'Medium (2000-35000 km)': 0,
-            'High (35000+ km)': 0
-        }
-        
-        object_types = {}
-        
-        for obj in debris:
-            try:
-                # Count by country
-                country_code = obj.get('OBJECT_ID', 'UN')[:2]
-                countries[country_code] = countries.get(country_code, 0) + 1
-                
-                # Count by type
-                obj_type = obj.get('OBJECT_TYPE', 'UNKNOWN')
-                object_types[obj_type] = object_types.get(obj_type, 0) + 1
-                
-                # Count by altitude
-                altitude = calculate_altitude(obj)
-                if altitude:
-                    if altitude < 2000:
-                        altitude_ranges['Low (0-2000 km)'] += 1
-                    elif altitude < 35000:
-                        altitude_ranges['Medium (2000-35000 km)'] += 1
-                    else:
-                        altitude_ranges['High (35000+ km)'] += 1
-            except Exception as e:
-                print(f"Error processing object for stats: {e}")
-                continue
-        
-        print(f"Stats calculated: {total} debris, {len(countries)} countries")
-        
-        return jsonify({
-            'total_debris': total,
-            'by_country': countries,
-            'by_altitude': altitude_ranges,
-            'by_type': object_types
-        })
+        return jsonify(processed['stats'])
         
     except Exception as e:
         print(f"Error in get_debris_stats: {e}")
@@ -280,6 +305,92 @@ def get_debris_stats():
         traceback.print_exc()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+def write_file(path, data):
+    """Write raw bytes to path"""
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        print(f"Error saving {path}: {e}")
+
+# Recent annotated JPEGs keyed by SHA-256 of the upload. Per process, so it only
+# skips repeat inference; the images themselves are inlined into the page
+_result_lru = OrderedDict()
+_result_lru_lock = threading.Lock()
+
+def get_cached_result(digest):
+    """Return the cached result JPEG for digest, or None"""
+    with _result_lru_lock:
+        entry = _result_lru.get(digest)
+        if entry is not None:
+            _result_lru.move_to_end(digest)
+        return entry
+
+def cache_result(digest, entry):
+    """Store a prediction, evicting the least recently used beyond RESULT_CACHE_SIZE"""
+    with _result_lru_lock:
+        _result_lru[digest] = entry
+        _result_lru.move_to_end(digest)
+        while len(_result_lru) > RESULT_CACHE_SIZE:
+            _result_lru.popitem(last=False)
+
+# Leading bytes of the formats cv2.imdecode reads; uploads are inlined with the
+# type found here, never the one the client claimed
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF8', 'image/gif'),
+    (b'BM', 'image/bmp'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+)
+
+def image_mimetype(data):
+    """Return the image mimetype of data from its magic bytes"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mimetype in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mimetype
+    return 'application/octet-stream'
+
+def data_uri(data, mimetype):
+    """Encode image bytes as a data: URI so the page needs no second request"""
+    return f"data:{mimetype};base64,{base64.b64encode(data).decode()}"
+
+def run_prediction(data):
+    """Detect debris in encoded image bytes and return the annotated image as JPEG bytes"""
+    # Decode the upload straight from memory and hand the array to YOLO
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+
+    # Run YOLO model
+    results = predict_image(img)
+    conf_threshold = 0.6
+
+    # One device-to-host copy of the (N, 6) [x1, y1, x2, y2, conf, cls] detections,
+    # then keep the confident ones
+    detections = results.boxes.data.cpu().numpy()
+    detections = detections[detections[:, 4] >= conf_threshold]
+    boxes = detections[:, :4].astype(np.int32)
+    confs = detections[:, 4]
+    cls_ids = detections[:, 5].astype(int)
+
+    # Draw all boxes in one call as closed quadrilaterals
+    if len(boxes):
+        polys = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+        cv2.polylines(img, polys, True, (0, 255, 0), 2)
+
+    # Labels still need one putText per surviving detection
+    for (x1, y1, _, _), cls_id, conf in zip(boxes.tolist(), cls_ids.tolist(), confs.tolist()):
+        label = f"{results.names[cls_id]} {conf:.2f}"
+        cv2.putText(img, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+
+    ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buf.tobytes() if ok else None
+
 @app.route('/predict', methods=["POST", "GET"])
 def predict():
     if 'file' not in request.files:
@@ -289,38 +400,35 @@ def predict():
     if file.filename == '':
         return jsonify({"error": "Empty filename"}), 400
 
-    # Save uploaded file
-    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(file_path)
+    data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
 
-    # Run YOLO model
-    results = model(file_path)[0]
-    conf_threshold = 0.6
+    # Identical uploads reuse the earlier prediction
+    result = get_cached_result(digest)
+    if result is None:
+        try:
+            result = run_prediction(data)
+        except TimeoutError as e:
+            print(f"Error in predict: {e}")
+            return jsonify({"error": "Server busy, try again later"}), 503
+        if result is None:
+            return jsonify({"error": "Could not decode image"}), 400
+        cache_result(digest, result)
+
+        if PERSIST_UPLOADS:
+            # Keep copies on disk off the critical path
+            filename = secure_filename(file.filename) or digest
+            result_filename = f"result_{os.path.splitext(filename)[0]}.jpg"
+            threading.Thread(target=write_file,
+                             args=(os.path.join(UPLOAD_FOLDER, filename), data)).start()
+            threading.Thread(target=write_file,
+                             args=(os.path.join(RESULT_FOLDER, result_filename), result)).start()
 
-    # Read uploaded image
-    img = cv2.imread(file_path)
-
-    # Loop over detections
-    for box in results.boxes:
-        conf = float(box.conf[0])
-        if conf >= conf_threshold:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cls_id = int(box.cls[0])
-            label = f"{model.names[cls_id]} {conf:.2f}"
-            # Draw box and label
-            cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(img, label, (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-    # Save result image
-    result_filename = f"result_{file.filename}"
-    result_path = os.path.join(RESULT_FOLDER, result_filename)
-    cv2.imwrite(result_path, img)
-
-    print(f"Saved result to {result_path}")
-    result_img = f"results/{result_filename}"   # relative to static
-    original_file_path = f"uploads/{file.filename}"
-    return render_template("index.html", result_img=result_img, upload_img=original_file_path)
+    # Inline both images: a follow-up request could land on another gunicorn
+    # worker, which wouldn't have this prediction in its cache
+    result_img = data_uri(result, 'image/jpeg')
+    upload_img = data_uri(data, image_mimetype(data))
+    return render_template("index.html", result_img=result_img, upload_img=upload_img)
 
 # Test endpoint to verify API is working
 @app.route('/api/test')
@@ -333,7 +441,7 @@ def test_api():
                 'status': 'success',
                 'message': 'CelesTrak API is accessible',
                 'sample_count': len(data),
-                'sample_object': data[0] if data else None
+                'sample_object': data.slice(0, 1).to_pylist()[0] if data else None
             })
         else:
             return jsonify({
@@ -347,4 +455,5 @@ def test_api():
         }), 500
 
 if __name__ == '__main__':
+    start_cache_refresher()
     app.run(debug=True)
\ No newline at end of file
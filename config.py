@@ -0,0 +1,32 @@
+from datetime import timedelta
+import os
+
+# Paths
+MODEL_PATH = 'best.pt'
+ENGINE_PATH = os.environ.get('YOLO_ENGINE_PATH', 'best.engine')
+UPLOAD_FOLDER = 'static/uploads'
+RESULT_FOLDER = 'static/results'
+CACHE_FILE = 'debris_cache.parquet'
+
+# Predictions are served from memory; set PERSIST_UPLOADS=1 to also keep copies on disk
+PERSIST_UPLOADS = os.environ.get('PERSIST_UPLOADS', '0') == '1'
+RESULT_CACHE_SIZE = 64  # annotated results kept in memory per worker
+
+# Inference
+IMG_SIZE = 640
+MAX_BATCH = 16  # largest batch handed to YOLO (also the engine's max batch)
+MAX_WAIT = 0.01  # seconds to wait for more images before running a batch
+PREDICT_TIMEOUT = float(os.environ.get('PREDICT_TIMEOUT', 30))  # seconds before /predict gives up with a 503
+
+# TensorRT precision: 'int8' (falls back to FP16 without calibration data) or 'fp16'
+YOLO_PRECISION = os.environ.get('YOLO_PRECISION', 'int8')
+INT8_ENGINE_PATH = os.environ.get('YOLO_INT8_ENGINE_PATH', 'best-int8.engine')
+INT8_CALIB_DATA = os.environ.get('YOLO_CALIB_DATA', 'calib.yaml')  # ~100 representative images
+INT8_GOLD_DATA = os.environ.get('YOLO_GOLD_DATA')  # optional labelled set to check INT8 accuracy
+INT8_MAX_MAP_DROP = float(os.environ.get('YOLO_INT8_MAX_MAP_DROP', 0.01))  # allowed mAP50-95 loss
+
+# CelesTrak
+CELESTRAK_URL = "https://celestrak.org/NORAD/elements/gp.php"
+CELESTRAK_HEADERS = {'Accept-Encoding': 'gzip', 'User-Agent': 'space-debris/1.0'}
+CACHE_DURATION = timedelta(hours=6)
+CACHE_REFRESH_AHEAD = timedelta(minutes=30)  # refresh this long before the cache expires
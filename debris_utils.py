@@ -0,0 +1,521 @@
+"""CelesTrak fetching, caching and debris aggregation behind the /api routes"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn, so a single process owns the cache anyway
+    fcntl = None
+
+import aiohttp
+import ijson
+import numba
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
+
+from config import (CACHE_DURATION, CACHE_FILE, CACHE_REFRESH_AHEAD,
+                    CELESTRAK_HEADERS, CELESTRAK_URL)
+
+# CelesTrak fields kept in the cache, with the defaults the API falls back to
+CACHE_SCHEMA = pa.schema([
+    ('OBJECT_NAME', pa.string()),
+    ('OBJECT_ID', pa.string()),
+    ('NORAD_CAT_ID', pa.int64()),
+    ('EPOCH', pa.string()),
+    ('MEAN_MOTION', pa.float64()),
+    ('INCLINATION', pa.float64()),
+    ('PERIOD', pa.float64()),
+    ('OBJECT_TYPE', pa.string()),
+])
+CACHE_DEFAULTS = {
+    'OBJECT_NAME': 'Unknown',
+    'OBJECT_ID': 'UN',
+    'OBJECT_TYPE': 'UNKNOWN',
+}
+
+# Retry policy shared by the sync and async fetchers
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5  # seconds, doubled after each retry
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Shared session so CelesTrak fetches reuse the TLS connection
+SESSION = requests.Session()
+SESSION.headers.update(CELESTRAK_HEADERS)
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=FETCH_RETRIES, backoff_factor=FETCH_BACKOFF,
+                      status_forcelist=RETRY_STATUSES)))
+
+def fetch_celestrak_data(group='analyst', format='json'):
+    """
+    Fetch orbital data from CelesTrak
+    
+    Args:
+        group: GROUP parameter (e.g., 'analyst', 'active', 'starlink')
+        format: FORMAT parameter (json, xml, csv, tle)
+    
+    JSON responses are stream-parsed straight into a CACHE_SCHEMA table.
+    """
+    params = {
+        'GROUP': group,
+        'FORMAT': format
+    }
+    
+    try:
+        print(f"Fetching data from CelesTrak: {CELESTRAK_URL} with params {params}")
+        # Close the response even if parsing fails midway, so its connection is released
+        with SESSION.get(CELESTRAK_URL, params=params, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            if format == 'json':
+                # Parse objects one at a time off the socket instead of loading
+                # the whole array, keeping only the columns we cache
+                response.raw.decode_content = True
+                data = records_to_table(ijson.items(response.raw, 'item', use_float=True))
+                print(f"Successfully fetched {data.num_rows} objects from CelesTrak")
+                return data
+            elif format == 'csv':
+                return response.text
+            else:
+                return response.text
+            
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, ijson.JSONError,
+            pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        print(f"Error fetching data from CelesTrak: {e}")
+        return None
+
+def records_to_table(records):
+    """Project an iterable of CelesTrak JSON records onto the cached columns in one pass"""
+    columns = {name: [] for name in CACHE_SCHEMA.names}
+    for obj in records:
+        for name, values in columns.items():
+            values.append(obj.get(name, CACHE_DEFAULTS.get(name)))
+    return pa.Table.from_pydict(columns, schema=CACHE_SCHEMA)
+
+async def records_to_table_async(records):
+    """Async variant of records_to_table for an async iterator of records"""
+    columns = {name: [] for name in CACHE_SCHEMA.names}
+    async for obj in records:
+        for name, values in columns.items():
+            values.append(obj.get(name, CACHE_DEFAULTS.get(name)))
+    return pa.Table.from_pydict(columns, schema=CACHE_SCHEMA)
+
+async def fetch_celestrak_data_async(group='analyst', format='json'):
+    """Async variant of fetch_celestrak_data that doesn't block the worker thread"""
+    params = {
+        'GROUP': group,
+        'FORMAT': format
+    }
+    
+    try:
+        print(f"Fetching data from CelesTrak: {CELESTRAK_URL} with params {params}")
+        # Flask runs every async view in its own event loop, so the session
+        # can't outlive the request; this only runs on a cache miss, at most
+        # once per group at a time (see get_processed)
+        async with aiohttp.ClientSession(headers=CELESTRAK_HEADERS,
+                                         timeout=aiohttp.ClientTimeout(total=30)) as session:
+            for attempt in range(FETCH_RETRIES + 1):
+                try:
+                    async with session.get(CELESTRAK_URL, params=params) as response:
+                        response.raise_for_status()
+                        
+                        if format == 'json':
+                            # Parse objects as chunks arrive instead of buffering the body
+                            data = await records_to_table_async(
+                                ijson.items_async(response.content, 'item', use_float=True))
+                            print(f"Successfully fetched {data.num_rows} objects from CelesTrak")
+                            return data
+                        else:
+                            return await response.text()
+                
+                except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError,
+                        asyncio.TimeoutError) as e:
+                    # Same policy as SESSION: retry connection errors and 5xx responses
+                    retryable = (not isinstance(e, aiohttp.ClientResponseError)
+                                 or e.status in RETRY_STATUSES)
+                    if attempt == FETCH_RETRIES or not retryable:
+                        raise
+                    print(f"Retrying CelesTrak fetch after error: {e}")
+                    await asyncio.sleep(FETCH_BACKOFF * 2 ** attempt)
+            
+    except (aiohttp.ClientError, asyncio.TimeoutError, ijson.JSONError,
+            pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        print(f"Error fetching data from CelesTrak: {e}")
+        return None
+
+_REFRESH_LOCK = threading.Lock()
+
+def refresh_cache(group='analyst'):
+    """Fetch fresh data from CelesTrak and overwrite the disk cache
+
+    Returns True if the cache was replaced.
+    """
+    data = fetch_celestrak_data(group=group, format='json')
+    if not data:
+        return False
+    write_cache(data)
+    return True
+
+def refresh_cache_in_background(group='analyst'):
+    """Start refresh_cache in a daemon thread unless one is already running"""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return
+    
+    def run():
+        try:
+            refresh_cache(group)
+        finally:
+            _REFRESH_LOCK.release()
+    
+    threading.Thread(target=run, daemon=True).start()
+
+def _refresher(group):
+    """Refresh the disk cache each time it turns CACHE_DURATION / 2 old so requests never fetch
+
+    A failed fetch is retried after another CACHE_DURATION / 2, while the old
+    cache is still within CACHE_DURATION.
+    """
+    interval = CACHE_DURATION / 2
+    while True:
+        age = cache_age()
+        if age is None or age >= interval:
+            try:
+                with _REFRESH_LOCK:
+                    refreshed = refresh_cache(group)
+                if refreshed:
+                    with _MEM_CACHE_LOCK:
+                        _MEM_CACHE.clear()
+            except Exception as e:
+                print(f"Error refreshing cache: {e}")
+            age = cache_age()
+        
+        # Wake when the cache reaches interval old rather than a fixed period
+        # after the check, which would let it drift up to CACHE_DURATION old
+        if age is None or age >= interval:
+            time.sleep(interval.total_seconds())
+        else:
+            time.sleep((interval - age).total_seconds())
+
+# Held open for the life of the process that owns the refresher
+_refresher_lock_file = None
+
+def start_cache_refresher(group='analyst'):
+    """Start the background refresh thread, in only one process per machine
+
+    Every gunicorn worker calls this; the first to take an exclusive lock on
+    CACHE_FILE.lock runs the refresher, and the others pick up its writes
+    through get_processed's mtime check.
+    """
+    global _refresher_lock_file
+    if _refresher_lock_file is not None:
+        return
+    
+    try:
+        lock_file = open(CACHE_FILE + '.lock', 'w')
+    except OSError as e:
+        print(f"Error opening refresher lock, not starting the refresher: {e}")
+        return
+    
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return
+    
+    _refresher_lock_file = lock_file
+    threading.Thread(target=_refresher, args=(group,), daemon=True).start()
+    print(f"Started CelesTrak cache refresher in process {os.getpid()}")
+
+def cache_age():
+    """Return how old the disk cache is, or None if there is no readable cache"""
+    if not os.path.exists(CACHE_FILE):
+        return None
+    
+    try:
+        return datetime.now() - data_timestamp(pq.read_schema(CACHE_FILE))
+    except Exception as e:
+        print(f"Error reading cache: {e}")
+        return None
+
+def data_timestamp(schema):
+    """Return when the data behind a cached table's schema was fetched from CelesTrak"""
+    return datetime.fromisoformat(schema.metadata[b'timestamp'].decode())
+
+def cache_mtime():
+    """Return the disk cache's modification time, or None if it doesn't exist"""
+    try:
+        return os.path.getmtime(CACHE_FILE)
+    except OSError:
+        return None
+
+def read_cache(group='analyst'):
+    """Return the cached table if it is still fresh, otherwise None"""
+    age = cache_age()
+    
+    if age is not None and age < CACHE_DURATION:
+        print("Using cached data")
+        if age > CACHE_DURATION - CACHE_REFRESH_AHEAD:
+            # About to expire: refresh now so no user waits on CelesTrak
+            refresh_cache_in_background(group)
+        try:
+            return pq.read_table(CACHE_FILE, memory_map=True)
+        except Exception as e:
+            print(f"Error reading cache: {e}")
+    
+    return None
+
+def write_cache(table):
+    """Persist a freshly fetched table to CACHE_FILE, stamped with the fetch time
+
+    The file is written beside the cache and renamed over it, so readers (and
+    existing memory maps) never see a partially written file.
+    """
+    table = table.replace_schema_metadata({'timestamp': datetime.now().isoformat()})
+    tmp_file = None
+    try:
+        # Unique per call, since a request and the refresher can write at once
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(CACHE_FILE)),
+                                        prefix=os.path.basename(CACHE_FILE) + '.', suffix='.tmp')
+        os.close(fd)
+        pq.write_table(table, tmp_file)
+        os.replace(tmp_file, CACHE_FILE)
+        print("Data cached successfully")
+    except Exception as e:
+        print(f"Error caching data: {e}")
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    
+    return table
+
+def get_cached_or_fetch(group='analyst'):
+    """Use cached data if available and fresh, otherwise fetch new data
+
+    Returns a pyarrow Table with the CACHE_SCHEMA columns, or None on failure.
+    """
+    table = read_cache(group)
+    if table is not None:
+        return table
+    
+    # Fetch fresh data
+    print("Fetching fresh data from CelesTrak...")
+    data = fetch_celestrak_data(group=group, format='json')
+    
+    if not data:
+        return None
+    
+    return write_cache(data)
+
+async def get_cached_or_fetch_async(group='analyst'):
+    """Async variant of get_cached_or_fetch; disk I/O runs in a worker thread"""
+    table = await asyncio.to_thread(read_cache, group)
+    if table is not None:
+        return table
+    
+    # Fetch fresh data
+    print("Fetching fresh data from CelesTrak...")
+    data = await fetch_celestrak_data_async(group=group, format='json')
+    
+    if not data:
+        return None
+    
+    return await asyncio.to_thread(write_cache, data)
+
+EARTH_RADIUS = 6371  # km
+MU = 398600.4418  # Earth's gravitational parameter (km^3/s^2)
+
+# Serial on purpose: there are only a few thousand objects, and a parallel
+# kernel called from the async views' threads hangs interpreter exit under TBB
+@numba.njit(cache=True)
+def _altitudes_kernel(mean_motion):
+    altitudes = np.empty_like(mean_motion)
+    for i in range(mean_motion.shape[0]):
+        mm = mean_motion[i]
+        if mm == 0 or np.isnan(mm):
+            altitudes[i] = np.nan
+        else:
+            period_seconds = 86400.0 / mm
+            a = (MU * (period_seconds / (2 * np.pi))**2)**(1.0 / 3.0)
+            altitudes[i] = round(a - EARTH_RADIUS, 2)
+    return altitudes
+
+def calculate_altitudes(mean_motion):
+    """Calculate approximate altitudes from a MEAN_MOTION array (NaN where unknown)"""
+    return _altitudes_kernel(np.ascontiguousarray(mean_motion, dtype=np.float64))
+
+# Debris markers as single alternations, so each string is scanned once by
+# Arrow's RE2 (DFA) matcher instead of once per substring. 'DEB' also covers 'DEBRIS'.
+DEBRIS_TYPE_PATTERN = 'DEB|ROCKET BODY'
+DEBRIS_NAME_PATTERN = 'DEB|R/B'
+
+def filter_debris_only(table):
+    """Filter to only debris objects"""
+    obj_type = pc.fill_null(table['OBJECT_TYPE'], '')
+    obj_name = pc.fill_null(table['OBJECT_NAME'], '')
+    
+    # Include DEBRIS, ROCKET BODY, and objects with DEB in name as space junk
+    is_debris = pc.or_(
+        pc.match_substring_regex(obj_type, DEBRIS_TYPE_PATTERN, ignore_case=True),
+        pc.match_substring_regex(obj_name, DEBRIS_NAME_PATTERN, ignore_case=True))
+    debris = table.filter(is_debris)
+    
+    print(f"Filtered {debris.num_rows} debris objects from {table.num_rows} total objects")
+    return debris
+
+def parse_satellite_data(data, altitudes):
+    """Parse and simplify satellite/debris data for young learners
+
+    altitudes holds the precomputed calculate_altitudes() value for each object.
+    """
+    simplified = []
+    
+    for i, obj in enumerate(data):
+        try:
+            # CelesTrak JSON format uses these field names
+            satellite_info = {
+                'name': obj.get('OBJECT_NAME', 'Unknown'),
+                'satellite_id': obj.get('NORAD_CAT_ID'),
+                'country': obj.get('OBJECT_ID', 'UN')[:2],  # First 2 chars indicate country
+                'launch_date': obj.get('EPOCH'),
+                'altitude_km': None if np.isnan(altitudes[i]) else float(altitudes[i]),
+                'inclination': obj.get('INCLINATION'),
+                'period_minutes': obj.get('PERIOD'),
+                'object_type': obj.get('OBJECT_TYPE', 'UNKNOWN')
+            }
+            simplified.append(satellite_info)
+        except Exception as e:
+            print(f"Error parsing object: {e}")
+            continue
+    
+    return simplified
+
+def calculate_debris_stats(debris, altitudes):
+    """Aggregate debris counts by altitude band, country and object type"""
+    total = len(debris)
+    
+    # Count by altitude: bins are [0, 2000), [2000, 35000), [35000, inf)
+    altitudes = altitudes[~np.isnan(altitudes)]
+    low, medium, high = np.bincount(np.digitize(altitudes, [2000, 35000]), minlength=3).tolist()
+    altitude_ranges = {
+        'Low (0-2000 km)': low,
+        'Medium (2000-35000 km)': medium,
+        'High (35000+ km)': high
+    }
+    
+    # Count by country (first 2 chars of OBJECT_ID), as a fixed-width 'U2' array
+    # so np.unique sorts contiguous UTF-32 cells rather than Python str objects.
+    # Nulls become 'UN' first; astype would otherwise turn None into 'No'
+    object_ids = pc.fill_null(debris['OBJECT_ID'], CACHE_DEFAULTS['OBJECT_ID'])
+    country_codes = pc.utf8_slice_codeunits(object_ids, 0, 2).to_numpy().astype('U2')
+    codes, counts = np.unique(country_codes, return_counts=True)
+    countries = dict(zip(codes.tolist(), counts.tolist()))
+    
+    # Count by type, with nulls as 'UNKNOWN' since a None key can't be serialized as JSON
+    object_types = pc.fill_null(debris['OBJECT_TYPE'], CACHE_DEFAULTS['OBJECT_TYPE'])
+    object_types = dict(Counter(object_types.to_pylist()))
+    
+    print(f"Stats calculated: {total} debris, {len(countries)} countries")
+    
+    return {
+        'total_debris': total,
+        'by_country': countries,
+        'by_altitude': altitude_ranges,
+        'by_type': object_types
+    }
+
+# Parsed /api/debris and /api/stats payloads per group, kept until their data is CACHE_DURATION old
+_MEM_CACHE = {}
+_MEM_CACHE_LOCK = threading.Lock()
+# Per-group locks so only one request rebuilds a stale entry. These are thread
+# locks because every async view runs in its own thread and event loop
+_REBUILD_LOCKS = {}
+
+def _fresh_entry(group):
+    """Return the in-memory entry for group if it is still current, otherwise None"""
+    with _MEM_CACHE_LOCK:
+        entry = _MEM_CACHE.get(group)
+    
+    # Also rebuild when another process (the refresher) has replaced the disk cache
+    if not entry or entry['mtime'] != cache_mtime():
+        return None
+    
+    # Age the entry by when its data was fetched, not when it was parsed
+    age = datetime.now() - entry['ts']
+    if age >= CACHE_DURATION:
+        return None
+    if age > CACHE_DURATION - CACHE_REFRESH_AHEAD:
+        # About to expire: refresh the disk cache so the next rebuild doesn't fetch
+        refresh_cache_in_background(group)
+    return entry
+
+async def get_processed(group='analyst'):
+    """Return the ready-to-serve debris and stats payloads, rebuilding them when stale
+
+    Concurrent misses for a group wait for the one rebuild and share its result.
+    """
+    entry = _fresh_entry(group)
+    if entry:
+        return entry
+    
+    with _MEM_CACHE_LOCK:
+        lock = _REBUILD_LOCKS.setdefault(group, threading.Lock())
+    await asyncio.to_thread(lock.acquire)
+    try:
+        # Another request may have rebuilt it while we waited
+        entry = _fresh_entry(group)
+        if entry:
+            return entry
+        return await _build_processed(group)
+    finally:
+        lock.release()
+
+async def _build_processed(group):
+    """Fetch, filter and aggregate group's data, and store it in _MEM_CACHE"""
+    # Fetch data with caching; a miss writes the disk cache, so take its mtime after
+    all_data = await get_cached_or_fetch_async(group=group)
+    mtime = cache_mtime()
+    
+    if not all_data:
+        print("No data returned from CelesTrak")
+        return None
+    
+    print(f"Processing {all_data.num_rows} total objects")
+    
+    # Filter to only debris
+    debris = filter_debris_only(all_data)
+    
+    if not debris:
+        # If no debris found with strict filtering, use all data
+        print("No debris found with filtering, using all data")
+        debris = all_data
+    
+    # Altitudes are computed once and shared by the debris list and the stats
+    altitudes = calculate_altitudes(debris['MEAN_MOTION'].to_numpy())
+    
+    # Parse the data
+    simplified = parse_satellite_data(debris.to_pylist(), altitudes)
+    
+    entry = {
+        'ts': data_timestamp(all_data.schema),
+        'mtime': mtime,
+        'debris': {
+            'count': len(simplified),
+            'debris': simplified[:100],  # Limit to 100 for performance
+            'total_tracked': all_data.num_rows
+        },
+        'stats': calculate_debris_stats(debris, altitudes)
+    }
+    with _MEM_CACHE_LOCK:
+        _MEM_CACHE[group] = entry
+    return entry
@@ -0,0 +1,19 @@
+import os
+
+# Keep each worker's torch/OpenCV/NumPy thread pools from fanning out across
+# every core; must be set before the app (and torch) is imported
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = 2
+
+# Import the app (and the CPU model) once in the master so workers share it
+preload_app = True
+
+def post_fork(server, worker):
+    # Threads don't survive the fork from the preloaded master, so start the
+    # cache refresher here; its file lock keeps it to a single worker
+    from debris_utils import start_cache_refresher
+    start_cache_refresher()